@@ -1,21 +1,50 @@
 import click
+import importlib
 
 # Set up console logging from package file
 # This configure root logger which is inherited 
 # by all modules/submodules
 import pkg_resources
 import logging, logging.config
-logging.config.fileConfig(pkg_resources.resource_filename(__name__, "logging.conf"))
+# Skip if already configured (e.g., re-imported by a test
+# harness or embedding application) to avoid stacking handlers
+if not logging.getLogger().handlers:
+    logging.config.fileConfig(pkg_resources.resource_filename(__name__, "logging.conf"))
 
 logger = logging.getLogger(__name__)
 
 import footprint_tools
-import footprint_tools.cli.learn_bm as learn_bm
-import footprint_tools.cli.learn_dm as learn_dm
-import footprint_tools.cli.detect as detect
-import footprint_tools.cli.learn_beta as learn_beta
-import footprint_tools.cli.plot_dm as plot_dm
-import footprint_tools.cli.post as post
+
+# Sub-command modules (and their dependencies) are only imported
+# when a command is invoked. Short help for each command is stored
+# here so that listing commands does not import any of them. NOTE: keep
+# these in sync with the first line of each command's `run` docstring
+# (shown by `<command> --help`)
+commands = {
+    'learn_bm': ('footprint_tools.cli.learn_bm', 'Learn a sequence bias model'),
+    'learn_dm': ('footprint_tools.cli.learn_dm', 'Learn a negative binomial dispersion model'),
+    'detect': ('footprint_tools.cli.detect', 'Compute per-nucleotide cleavage deviation statistics'),
+    'learn_beta': ('footprint_tools.cli.learn_beta', 'Learn the parameters of a Beta distribution'),
+    'plot_dm': ('footprint_tools.cli.plot_dm', 'Diagnostic plotting of a dispersion model'),
+    'posterior': ('footprint_tools.cli.post', 'Compute footprint posterior probabilities'),
+}
+
+class lazy_group(click.Group):
+    """Click group that loads sub-commands on demand"""
+
+    def list_commands(self, ctx):
+        return sorted(commands)
+
+    def get_command(self, ctx, name):
+        if name not in commands:
+            return None
+        return importlib.import_module(commands[name][0]).run
+
+    def format_commands(self, ctx, formatter):
+        """List sub-commands using the stored short help"""
+        rows = [(name, commands[name][1]) for name in self.list_commands(ctx)]
+        with formatter.section('Commands'):
+            formatter.write_dl(rows)
 
 epilog = """See http://github.com/jvierstra/footprint-tools for extended documentation.
 
@@ -23,7 +52,7 @@ Citation: Vierstra, J., Lazar, J., Sandstrom, R. et al. Global reference mapping
 
 Written by Jeff Vierstra (jvierstra@altius.org) (2015-2021). Software licensed under GNU General Public License version 3."""
 
-@click.group(epilog=epilog)
+@click.group(cls=lazy_group, epilog=epilog)
 @click.version_option(version=footprint_tools.__version__)
 def main():
     """footprint_tools: analysis of digital genomic footprints 
@@ -35,11 +64,4 @@ def main():
     to footprint detection in a single, isolated dataset, this package has a statistical framework
     to jointly analyze 100s to 1000s of datasets in unison.
     """
-    pass
-
-main.add_command(learn_bm.run)
-main.add_command(learn_dm.run)
-main.add_command(detect.run)
-main.add_command(learn_beta.run)
-main.add_command(plot_dm.run)
-main.add_command(post.run)
\ No newline at end of file
+    pass
\ No newline at end of file
@@ -5,7 +5,6 @@ from multiprocessing import cpu_count
 
 import numpy as np
 import scipy as sp
-import pandas as pd
 
 import pysam
 pysam.set_verbosity(0)
@@ -15,10 +14,10 @@ from genome_tools.data.dataset import dataset
 
 from footprint_tools import cutcounts
 from footprint_tools.modeling import bias, predict, dispersion
-from footprint_tools.stats import fdr, windowing
+from footprint_tools.stats import fdr, windowing, utils
 
 from footprint_tools.cli.utils import (list_args, tuple_args, get_kwargs, 
-                                        verify_bam_file, verify_fasta_file, write_output_header,
+                                        verify_bam_file, verify_fasta_file, get_file_handle, write_output_header,
                                         write_stats_to_output, write_segments_to_output)
 
 from tqdm import tqdm
@@ -35,10 +34,20 @@ class deviation_stats(dataset):
     deviation statistics
     """
     def __init__(self, interval_file, bam_file, fasta_file, bm, dm, **kwargs):
+        import pandas as pd
 
-        self.intervals = pd.read_table(interval_file, header=None)
+        # Only chrom, start and end are used; parse just these columns with
+        # fixed types so the C parser skips type inference on the rest
+        intervals = pd.read_table(interval_file, header=None, usecols=[0, 1, 2],
+                                    dtype={0: str, 1: np.int64, 2: np.int64})
 
-        logger.info(f"BED file contains {len(self.intervals):,} regions")
+        # Keep coordinates as arrays (rather than the DataFrame) to avoid
+        # pandas indexing overhead on every call to `__getitem__`
+        self.chroms = intervals[0].to_numpy()
+        self.starts = intervals[1].to_numpy()
+        self.ends = intervals[2].to_numpy()
+
+        logger.info(f"BED file contains {len(self):,} regions")
 
         self.bam_file = bam_file
         self.fasta_file = fasta_file
@@ -51,7 +60,8 @@ class deviation_stats(dataset):
                 'min_qual',
                 'remove_dups',
                 'remove_qcfail',
-                'offset'
+                'offset',
+                'threads'
             ], 
             kwargs)
 
@@ -68,18 +78,39 @@ class deviation_stats(dataset):
         self.fdr_shuffle_n = kwargs['fdr_shuffle_n']
         self.seed = kwargs['seed']
 
+        # Generator used when no seed is given; created on first call
+        # so that each worker process draws from its own stream
+        self.rng = None
+
         self.counts_extractor = None
         self.fasta_extractor = None
         self.count_predictor = None
 
-        self.win_pval_fn = lambda z: windowing.stouffers_z(np.ascontiguousarray(z), 3)
+        # Scratch buffers for p-values (observed in the first column and
+        # sampled null in the rest) and their windowed values; allocated
+        # on first call, reused for subsequent intervals and grown when
+        # an interval does not fit
+        self.pvals_buffer = None
+        self.win_pvals_buffer = None
 
     def cleanup(self):
         """Needs to be implemented"""
         pass
 
     def __len__(self):
-        return len(self.intervals)
+        return self.starts.shape[0]
+
+    def _get_rng(self, index):
+        """Get the random number generator for an interval. With a seed
+        the stream depends only on the seed and the interval index, so
+        results are reproducible regardless of the number of workers
+        """
+        if self.seed is not None:
+            return np.random.default_rng([self.seed, index])
+
+        if self.rng is None:
+            self.rng = np.random.default_rng()
+        return self.rng
 
     def __getitem__(self, index):
         """Process data for a single interval"""
@@ -87,14 +118,20 @@ class deviation_stats(dataset):
         # Open file handlers on first call. This avoids problems when
         # parallel processing data with non-thread safe code (i.e., pysam)
         if not self.counts_extractor:
-            self.counts_extractor = cutcounts.bamfile(self.bam_file, **self.counts_reader_kwargs)
-            self.fasta_extractor = pysam.FastaFile(self.fasta_file, **self.fasta_reader_kwargs)
+            self.counts_extractor = get_file_handle(
+                ('bam', self.bam_file, tuple(sorted(self.counts_reader_kwargs.items()))),
+                lambda: cutcounts.bamfile(self.bam_file, **self.counts_reader_kwargs))
+            # Sequence is not needed with a uniform bias model
+            if not isinstance(self.bm, bias.uniform_model):
+                self.fasta_extractor = get_file_handle(
+                    ('fasta', self.fasta_file, tuple(sorted(self.fasta_reader_kwargs.items()))),
+                    lambda: pysam.FastaFile(self.fasta_file, **self.fasta_reader_kwargs))
             self.count_predictor = predict.prediction(self.counts_extractor, self.fasta_extractor, 
                                                         self.bm, **self.counts_predictor_kwargs)
 
-        chrom, start, end = (self.intervals.iat[index, 0], 
-                             self.intervals.iat[index, 1], 
-                             self.intervals.iat[index, 2])
+        chrom, start, end = (self.chroms[index], 
+                             int(self.starts[index]), 
+                             int(self.ends[index]))
 
         interval = genomic_interval(chrom, start, end)
 
@@ -106,19 +143,41 @@ class deviation_stats(dataset):
         n = len(obs)
 
         if self.dm:
+            # Grow scratch buffers (geometrically) to fit this interval. Done
+            # outside of the `try` so that allocation failures are raised
+            if self.pvals_buffer is None or self.pvals_buffer.shape[0] < n:
+                size = n if self.pvals_buffer is None else max(n, 2*self.pvals_buffer.shape[0])
+                pvals_buffer = np.empty((size, self.fdr_shuffle_n+1), dtype=np.float64)
+                win_pvals_buffer = np.empty_like(pvals_buffer)
+                self.pvals_buffer, self.win_pvals_buffer = pvals_buffer, win_pvals_buffer
+
             try:
                 pvals = self.dm.p_values(exp, obs)
-                win_pvals = self.win_pval_fn(pvals)
+                _, pvals_null = self.dm.sample(exp, self.fdr_shuffle_n, rng=self._get_rng(index))
 
-                _, pvals_null = self.dm.sample(exp, self.fdr_shuffle_n)
-                win_pvals_null = np.apply_along_axis(self.win_pval_fn, 0, pvals_null)
+                # Combine observed and null p-values in a single pass
+                all_pvals = self.pvals_buffer[:n]
+                all_pvals[:,0] = pvals
+                all_pvals[:,1:] = pvals_null
+
+                # `all_pvals` is scratch space; it is overwritten with z-scores
+                all_win_pvals = windowing.stouffers_z_2d(all_pvals, 3, out=self.win_pvals_buffer[:n],
+                                                            overwrite_x=True)
+                win_pvals = all_win_pvals[:,0]
+                win_pvals_null = all_win_pvals[:,1:]
 
                 efdr = fdr.emperical_fdr(win_pvals_null, win_pvals)
             except Exception as e:
                 logger.warning(f"Error computing stats for '{interval.chrom}:{interval.start}-{interval.end}'")
                 pvals = win_pvals = efdr = np.ones(n) # should change to return 'nan'
             finally:
-                stats = np.column_stack((exp, obs, -np.log(pvals), -np.log(win_pvals), efdr))
+                # Fill columns in place (avoids temporaries from `np.column_stack`)
+                stats = np.empty((n, 5), dtype=np.float64)
+                stats[:,0] = exp
+                stats[:,1] = obs
+                np.negative(np.log(pvals, out=stats[:,2]), out=stats[:,2])
+                np.negative(np.log(win_pvals, out=stats[:,3]), out=stats[:,3])
+                stats[:,4] = efdr
         else:
             stats = np.column_stack((exp, obs))
 
@@ -176,8 +235,13 @@ class deviation_stats(dataset):
 @optgroup.option('--bam_offset', type=click.STRING,
     default="0,-1", show_default=True, callback=tuple_args(int),
     help='BAM file offset (enables support for other datatypes -- e.g. Tn5/ATAC)')
-@optgroup.option('--seed', type=click.INT,
-    help='Seed for random number generation (not currently used)')
+@optgroup.option('--bam_decompress_threads', type=click.IntRange(1, None),
+    default=1, show_default=True,
+    help='Number of htslib threads used to decompress the BAM file (per process)')
+@optgroup.option('--seed', type=click.IntRange(0, None),
+    help='Seed for random number generation used to sample the null '
+        'distribution. Results are reproducible for a given seed '
+        'regardless of the number of threads')
 @optgroup.option('--n_threads', type=click.IntRange(1, cpu_count()),
     default=cpu_count(), show_default=True,
     help='Number of processors to use')
@@ -193,6 +257,7 @@ def run(interval_file,
         keep_dups=False,
         keep_qcfail=False,
         bam_offset=(0, -1),
+        bam_decompress_threads=1,
         half_win_width=5,
         smooth_half_win_width=50,
         smooth_clip=0.01,
@@ -213,17 +278,22 @@ def run(interval_file,
     Footprints are *optionally* written to a BED3-format file: <outprefix>.fdr<thresh>.bed).
     Footprint FDR threshold(s) can be specified using the ``--write_footprints`` option.
     Output file column definitions are written to a header within each file.
+
+    Windowed p-values are combined using Stouffer's method. Windows that contain
+    a per-nucleotide p-value of 0 or 1 report a windowed p-value of 0 or 1,
+    respectively (earlier versions reported NaN).
     """
     proc_kwargs = {
         "min_qual": min_qual,
         "remove_dups": ~keep_dups,
         "remove_qcfail": ~keep_qcfail,
         "offset": bam_offset,
+        "threads": bam_decompress_threads,
         "half_win_width": half_win_width,
         "smoothing_half_win_width": smooth_half_win_width,
         "smoothing_clip": smooth_clip,
         "fdr_shuffle_n": fdr_shuffle_n,
-        "seed": seed, # not used...yet
+        "seed": seed,
     }
 
     # Validate and load inputs
@@ -258,7 +328,7 @@ def run(interval_file,
         # Output stats file
         output_bedgraph_file = outprefix + '.bedgraph'
         logger.info(f"Writing per-nucleotide stats to {output_bedgraph_file}")
-        output_bedgraph_filehandle = open(output_bedgraph_file , 'w')
+        output_bedgraph_filehandle = open(output_bedgraph_file , 'w', buffering=1<<20)
         write_output_header(["exp", "obs", "-log(pval)", "-log(winpval)", "fdr"], file=output_bedgraph_filehandle)
 
         # Output footprints filex
@@ -268,7 +338,7 @@ def run(interval_file,
         if len(write_footprints) > 0:
             logger.info(f"Writing FDR thresholded footprints to {output_bed_file_template.format('{threshold}')} for threshold \u22f2 {write_footprints}")
             for t in write_footprints:
-                fh =  open(output_bed_file_template.format(t), 'w')
+                fh =  open(output_bed_file_template.format(t), 'w', buffering=1<<20)
                 write_output_header(["name", "fdr"], file=fh, extra=f"thresholded @ FDR {t}")
                 output_bed_filehandles.update({t:fh})
 
@@ -276,6 +346,8 @@ def run(interval_file,
         logger.critical(e)
         raise click.Abort()
     
+    thresholds = np.array(list(output_bed_filehandles.keys()), dtype=np.float64)
+
     # Create data processor and iterator
     dl = deviation_stats(interval_file, bam_file, fasta_file, bm, dm, **proc_kwargs)
     dl_iter = dl.batch_iter(batch_size=batch_size, num_workers=n_threads)
@@ -288,11 +360,14 @@ def run(interval_file,
                 # write stats
                 write_stats_to_output(interval, stats, output_bedgraph_filehandle)
 
-                # write footprints
-                for thresh, fh in output_bed_filehandles.items():
-                    # fdr is last column in stats array
+                # write footprints; fdr is last column in stats array
+                if len(output_bed_filehandles) > 0:
+                    # segment at all thresholds in a single pass
+                    segments = utils.segment_multi(stats[:,-1], thresholds, 3, decreasing=True)
 
-                    write_segments_to_output(interval, stats[:,-1], thresh, file=fh, decreasing=True)
+                    for (thresh, fh), segs in zip(output_bed_filehandles.items(), segments):
+                        write_segments_to_output(interval, stats[:,-1], thresh, file=fh,
+                                                    decreasing=True, segments=segs)
 
     output_bedgraph_filehandle.close()
     [f.close() for f in output_bed_filehandles.values()]
\ No newline at end of file
@@ -5,7 +5,6 @@ from multiprocessing import cpu_count
 
 import numpy as np
 import scipy as sp
-import pandas as pd
 import pysam
 
 from genome_tools import genomic_interval
@@ -15,7 +14,8 @@ from genome_tools.data.utils import numpy_collate_concat
 from footprint_tools import cutcounts
 from footprint_tools.modeling import bias, predict, dispersion
 
-from footprint_tools.cli.utils import (tuple_args, get_kwargs, verify_bam_file, verify_fasta_file)
+from footprint_tools.cli.utils import (tuple_args, get_kwargs, verify_bam_file, verify_fasta_file,
+                                        get_file_handle)
 
 from tqdm import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
@@ -30,10 +30,20 @@ class expected_counts(dataset):
     """Computes observed and expected cleavage counts
     """
     def __init__(self, interval_file, bam_file, fasta_file, bm, **kwargs):
-       
-        self.intervals = pd.read_table(interval_file, header=None)
+        import pandas as pd
 
-        logger.info(f"BED file contains {len(self.intervals):,} regions")
+        # Only chrom, start and end are used; parse just these columns with
+        # fixed types so the C parser skips type inference on the rest
+        intervals = pd.read_table(interval_file, header=None, usecols=[0, 1, 2],
+                                    dtype={0: str, 1: np.int64, 2: np.int64})
+
+        # Keep coordinates as arrays (rather than the DataFrame) to avoid
+        # pandas indexing overhead on every call to `__getitem__`
+        self.chroms = intervals[0].to_numpy()
+        self.starts = intervals[1].to_numpy()
+        self.ends = intervals[2].to_numpy()
+
+        logger.info(f"BED file contains {len(self):,} regions")
 
         self.bam_file = bam_file
         self.fasta_file = fasta_file
@@ -45,7 +55,8 @@ class expected_counts(dataset):
                 'min_qual',
                 'remove_dups',
                 'remove_qcfail',
-                'offset'
+                'offset',
+                'threads'
             ], 
             kwargs)
 
@@ -62,7 +73,7 @@ class expected_counts(dataset):
         self.count_predictor = None
 
     def __len__(self):
-        return len(self.intervals)
+        return self.starts.shape[0]
 
     def __getitem__(self, index):
         """Process data for a single interval"""
@@ -70,14 +81,18 @@ class expected_counts(dataset):
         # Open file handlers on first call. This avoids problems when
         # parallel processing data with non-thread safe code (i.e., pysam)
         if not self.counts_extractor:
-            self.counts_extractor = cutcounts.bamfile(self.bam_file, **self.counts_reader_kwargs)
-            self.fasta_extractor = pysam.FastaFile(self.fasta_file, **self.fasta_reader_kwargs)
+            self.counts_extractor = get_file_handle(
+                ('bam', self.bam_file, tuple(sorted(self.counts_reader_kwargs.items()))),
+                lambda: cutcounts.bamfile(self.bam_file, **self.counts_reader_kwargs))
+            self.fasta_extractor = get_file_handle(
+                ('fasta', self.fasta_file, tuple(sorted(self.fasta_reader_kwargs.items()))),
+                lambda: pysam.FastaFile(self.fasta_file, **self.fasta_reader_kwargs))
             self.count_predictor = predict.prediction(self.counts_extractor, self.fasta_extractor, 
                                                         self.bm, **self.counts_predictor_kwargs)
 
-        chrom, start, end = (self.intervals.iat[index, 0], 
-                             self.intervals.iat[index, 1], 
-                             self.intervals.iat[index, 2])
+        chrom, start, end = (self.chroms[index], 
+                             int(self.starts[index]), 
+                             int(self.ends[index]))
 
         interval = genomic_interval(chrom, start, end)
 
@@ -117,6 +132,9 @@ class expected_counts(dataset):
 @optgroup.option('--bam_offset', type=click.STRING,
     default="0,-1", show_default=True, callback=tuple_args(int),
     help='BAM file offset (enables support for other datatypes -- e.g. Tn5/ATAC)')
+@optgroup.option('--bam_decompress_threads', type=click.IntRange(1, None),
+    default=1, show_default=True,
+    help='Number of htslib threads used to decompress the BAM file (per process)')
 @optgroup.option('--n_threads', type=click.IntRange(1, cpu_count()),
     default=cpu_count(), show_default=True,
     help='Number of processors to use')
@@ -131,6 +149,7 @@ def run(interval_file,
         keep_dups=False,
         keep_qcfail=False,
         bam_offset=(0, -1),
+        bam_decompress_threads=1,
         half_win_width=5,
         n_threads=cpu_count(),
         batch_size=100,
@@ -154,6 +173,7 @@ def run(interval_file,
         "remove_dups": ~keep_dups,
         "remove_qcfail": ~keep_qcfail,
         "offset": bam_offset,
+        "threads": bam_decompress_threads,
         "half_win_width": half_win_width,
     }
 
@@ -185,13 +205,15 @@ def run(interval_file,
     with logging_redirect_tqdm():
 
         for cnts in tqdm(dl_iter, colour='#cc951d'):
-            for i in range(cnts.shape[0]):
-                try:
-                    # expected, observed
-                    hist[int(cnts[i,0]),int(cnts[i, 1])] += 1
-                # ignore counts bigger than histogram bounds
-                except IndexError:
-                    pass
+            # expected, observed
+            e = cnts[:,0].astype(np.intp)
+            o = cnts[:,1].astype(np.intp)
+
+            # ignore counts bigger than histogram bounds
+            m = (e >= 0) & (e < hist_size[0]) & (o >= 0) & (o < hist_size[1])
+
+            hist += np.bincount(np.ravel_multi_index((e[m], o[m]), hist_size),
+                                minlength=hist.size).reshape(hist_size)
 
     logger.info("Learning dispersion model")
     
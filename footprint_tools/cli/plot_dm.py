@@ -3,12 +3,7 @@ from click_option_group import optgroup
 
 import math
 
-from matplotlib.pylab import rcParams
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as mgridspec
-
 from footprint_tools.modeling import dispersion
-from footprint_tools.plotting import (plot_model_fit, plot_model_histogram)
 
 from footprint_tools.cli.utils import list_args
 
@@ -32,6 +27,13 @@ def run(dispersion_model_file, histograms=[15,25,50,75], outfile='dm.pdf'):
 
     Outputs a PDF with plots
     """
+    # Plotting libraries are slow to import; only load them when needed
+    from matplotlib.pylab import rcParams
+    import matplotlib.pyplot as plt
+    import matplotlib.gridspec as mgridspec
+
+    from footprint_tools.plotting import (plot_model_fit, plot_model_histogram)
+
     try:
         dm = dispersion.load_dispersion_model(dispersion_model_file)
     except IOError as e:
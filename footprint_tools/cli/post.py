@@ -5,7 +5,6 @@ from multiprocessing import cpu_count
 
 import numpy as np
 import scipy as sp
-import pandas as pd
 
 import pysam
 pysam.set_verbosity(0)
@@ -33,6 +32,7 @@ required_sample_data_cols = ["id", "tabix_file", "dm_file", "beta_a", "beta_b"]
 
 class posterior_stats(dataset):
     def __init__(self, interval_file, samples_data, fdr_cutoff):
+        import pandas as pd
 
         self.intervals = pd.read_table(interval_file)
         self.samples_data = samples_data
@@ -164,6 +164,8 @@ def run(sample_data_file,
     order as the sample data file.
     """
 
+    import pandas as pd
+
     logger.info(f"Loading sample data file {sample_data_file}")
     try:
         sample_data = pd.read_table(sample_data_file, header=0, comment='#')
@@ -188,7 +190,7 @@ def run(sample_data_file,
         # Output stats file
         output_bedgraph_file = outprefix + '.bedgraph'
         logger.info(f"Writing per-nucleotide stats to {output_bedgraph_file}")
-        output_bedgraph_filehandle = open(output_bedgraph_file , 'w')
+        output_bedgraph_filehandle = open(output_bedgraph_file , 'w', buffering=1<<20)
 
         #write header lines
         write_output_header(sample_data["id"], output_bedgraph_filehandle)
@@ -30,10 +30,10 @@ def get_kwargs(keys, kwargs):
 """
 File validation functions
 """
-import pysam
 
 def verify_bam_file(fn):
     """Tries to open a file, raises IOError with problems"""
+    import pysam
     try:
         pysam.AlignmentFile(fn).close()
     except IOError:
@@ -43,6 +43,7 @@ def verify_bam_file(fn):
 
 def verify_tabix_file(fn):
     """Tries to open a file, raises IOError with problems"""
+    import pysam
     try:
         pysam.TabixFile(fn).close()
     except IOError:
@@ -52,6 +53,7 @@ def verify_tabix_file(fn):
 
 def verify_fasta_file(fn):
     """Tries to open a file, raises IOError with problems"""
+    import pysam
     try:
         pysam.FastaFile(fn).close()
     except IOError:
@@ -59,6 +61,37 @@ def verify_fasta_file(fn):
     except ValueError:
         raise IOError(f"FASTA-index not found for {fn}")
 
+"""
+File handle caching
+"""
+import os
+
+# Handles are keyed by process id so that child processes open their own.
+# Handles inherited from a parent process stay referenced in the child
+# (and are never used): deallocating them would close the parent's htslib
+# file (and decompression thread pool) from the child
+_file_handles = {}
+
+def get_file_handle(key, open_fn):
+    """Returns a per-process cached file handle, opening the file on first use
+
+    Parameters
+    ----------
+    key : tuple
+        Hashable key identifying the file and the options used to open it
+    open_fn : callable
+        Function (no arguments) that opens and returns the file handle
+
+    Returns
+    -------
+    handle : object
+        Cached file handle
+    """
+    key = (os.getpid(), key)
+    if key not in _file_handles:
+        _file_handles[key] = open_fn()
+    return _file_handles[key]
+
 """
 Writer functions
 """
@@ -124,18 +157,22 @@ def write_stats_to_output(interval, stats, file=sys.stdout, delim='\t', filter_f
 
     If filter_fn is not specified all rows are outputted
     """    
-    chrom = interval.chrom
+    chrom = interval.chrom.replace('{', '{{').replace('}', '}}')
     start = interval.start
 
-    idxs = np.nonzero(filter_fn(stats)) if filter_fn else range(stats.shape[0])
+    idxs = np.nonzero(filter_fn(stats))[0] if filter_fn else np.arange(stats.shape[0])
+
+    # Format each row from a single template and write all rows at once
+    row_fmt = delim.join([chrom, '{0}', '{1}']
+        + ['{'+str(j+2)+':'+fmt_string+'}' for j in range(stats.shape[1])]) + '\n'
 
-    for i in idxs:
-        out = f'{chrom}{delim}{start+i}{delim}{start+i+1}{delim}'
-        out += delim.join([('{0:'+fmt_string+'}').format(val) for val in stats[i,:]])
-        file.write(out+'\n')
+    positions = (start + idxs).tolist()
+    file.write(''.join([row_fmt.format(pos, pos+1, *vals)
+        for pos, vals in zip(positions, stats[idxs,:].tolist())]))
 
 def write_segments_to_output(interval, stats, threshold, name='.', file=sys.stdout,
-                            delim='\t', score_fn=np.min, decreasing=False, fmt_string='0.4f'):
+                            delim='\t', score_fn=np.min, decreasing=False, fmt_string='0.4f',
+                            segments=None):
     """Write footprints to file
     
     Parameters
@@ -158,16 +195,22 @@ def write_segments_to_output(interval, stats, threshold, name='.', file=sys.stdo
         Name for BED entry
     fmt_string: str
         Format string to apply when writing scores
+    segments: list, optional
+        Pre-computed segments (e.g., from :func:`utils.segment_multi`).
+        If not specified, segments are computed from `threshold`
     """
     chrom = interval.chrom
     start = interval.start
 
     assert stats.ndim == 1
 
-    segments = utils.segment(stats, threshold, 3, decreasing=decreasing)
+    if segments is None:
+        segments = utils.segment(stats, threshold, 3, decreasing=decreasing)
 
+    # Write all segments within the interval at once
+    out = ''
     for s, e in segments:
         score = score_fn(stats[s:e])        
-        out = f"{chrom}{delim}{start+s}{delim}{start+e}{delim}{name}{delim}"
-        out += ('{0:'+fmt_string+'}').format(score)
-        file.write(out+'\n')
+        out += f"{chrom}{delim}{start+s}{delim}{start+e}{delim}{name}{delim}"
+        out += ('{0:'+fmt_string+'}').format(score) + '\n'
+    file.write(out)
@@ -43,6 +43,8 @@ class bamfile(object):
         Remove reads with QC fail flag (1024) set
     samfile : pysam.Samfile
         SAM/BAM file object
+    threads : int
+        Number of htslib threads used to decompress the BAM file
     """
     
     def __init__(self, 
@@ -50,7 +52,8 @@ class bamfile(object):
                 min_qual = 1, 
                 remove_dups = False,
                 remove_qcfail = True,
-                offset = (0, -1)):
+                offset = (0, -1),
+                threads = 1):
         """Constructor
         
         Parameters
@@ -65,6 +68,9 @@ class bamfile(object):
             Remove reads with QC fail flag (1024) set
         offset : tuple, optional
             Position offsets to apply to the `+` and `-` strands (default =(0, -1))
+        threads : int, optional
+            Number of htslib threads used to decompress the BAM file. Values
+            greater than 1 overlap BGZF decompression with processing (default = 1)
    
         Raises
         ------
@@ -75,7 +81,7 @@ class bamfile(object):
         """
 
         try:
-            self.samfile = pysam.Samfile(filepath, "rb")
+            self.samfile = pysam.Samfile(filepath, "rb", threads = threads)
         except:
             raise IOError("Cannot open BAM file: %s" % filepath)
 
@@ -83,6 +89,7 @@ class bamfile(object):
         self.min_qual = min_qual
         self.remove_dups = remove_dups
         self.remove_qcfail = remove_qcfail
+        self.threads = threads
         
     def close(self):
         """Closes BAM file
@@ -5,6 +5,11 @@ import numpy as np
 import itertools
 import random
 
+# 2-bit encoding of nucleotides (other characters are encoded as 4)
+_base_codes = np.full(256, 4, dtype = np.uint8)
+for _i, _base in enumerate('ACGT'):
+    _base_codes[ord(_base)] = _i
+
 class bias_model(object):
 
     def __init__(self):
@@ -57,7 +62,16 @@ class kmer_model(bias_model):
     def __init__(self, filepath):
         
         bias_model.__init__(self)		
+
+        # Lookup table indexed by 2-bit encoded k-mers; built on first call to `probs`
+        self._table = None
+
         self.read_model(filepath)
+
+    def __setitem__(self, key, value):
+
+        bias_model.__setitem__(self, key, value)
+        self._table = None
     
     def read_model(self, filepath):
         """Read the k-mer model from a file.
@@ -85,7 +99,28 @@ class kmer_model(bias_model):
         except IOError:
             
             raise IOError("Cannot open file: %s" % filepath)
-    
+
+        self._table = None
+
+    def _build_table(self):
+        """Flatten the k-mer model into an array indexed by 2-bit encoded k-mers
+
+        Returns
+        -------
+        out : :class:`numpy.ndarray`
+            Array of length 4^k with the model value of each k-mer
+        """
+        k = self.k
+        table = np.full(4**k, 1e-6, dtype = np.float64) # same default as `__getitem__`
+        place = 4**np.arange(k-1, -1, -1)
+
+        for seq, prob in self.model.items():
+            codes = _base_codes[np.frombuffer(seq.encode('ascii'), dtype = np.uint8)]
+            if len(codes) == k and np.all(codes < 4):
+                table[np.dot(codes, place)] = prob
+
+        return table
+
     def probs(self, seq):
         """Generate cleavage preference array from DNA sequence
 
@@ -103,7 +138,31 @@ class kmer_model(bias_model):
         mid = self.mid
         offset = self.offset()
 
-        return np.array([ self.__getitem__( seq[(i-mid):(i+(k-mid))] ) for i in range(offset, len(seq)-offset) ], dtype = np.float64)
+        n = len(seq) - 2*offset
+        if n <= 0:
+            return np.zeros(0, dtype = np.float64)
+
+        if self._table is None:
+            self._table = self._build_table()
+
+        # Encode each k-mer (seq[(i-mid):(i+(k-mid))]) as an integer index
+        codes = _base_codes[np.frombuffer(seq.encode('ascii'), dtype = np.uint8)]
+
+        idx = np.zeros(n, dtype = np.intp)
+        invalid = np.zeros(n, dtype = bool)
+
+        for j in range(offset-mid, offset-mid+k):
+            c = codes[j:j+n]
+            idx = (idx << 2) | (c & 3)
+            invalid |= (c > 3)
+
+        res = self._table[idx]
+
+        # k-mers with non-ACGT characters are looked up directly
+        for i in np.flatnonzero(invalid):
+            res[i] = self.__getitem__( seq[(i+offset-mid):(i+offset+(k-mid))] )
+
+        return res
 
 class uniform_model(bias_model):
 
@@ -23,6 +23,12 @@ cdef class dispersion_model:
     
     cpdef str _metadata
 
+    cdef data_type_t [:, :] _cdf_table
+    cdef int _cdf_table_exp_max
+    cdef int _cdf_table_obs_max
+
+    cdef data_type_t _cdf(self, data_type_t x, int k)
+
     cpdef data_type_t fit_mu(self, data_type_t x)
     cpdef data_type_t fit_r(self, data_type_t x)
 
@@ -33,5 +39,5 @@ cdef class dispersion_model:
     cpdef data_type_t [:] pmf_values_0(self, data_type_t [:] exp, data_type_t [:] obs, data_type_t [:] res)
 
     cpdef data_type_t [:] p_values(self, data_type_t [:] exp, data_type_t [:] obs)
-    cpdef sample(self, data_type_t [:] x, int times)
+    cpdef sample(self, data_type_t [:] x, int times, rng = *)
     
\ No newline at end of file
@@ -11,14 +11,14 @@ cimport cython
 cimport numpy as np
 import numpy as np
 
+from libc.math cimport isnan
+
 import footprint_tools
 
 from footprint_tools.stats.distributions cimport nbinom
 from footprint_tools.stats.distributions import nbinom
 
 import warnings
-from scipy import optimize
-import pwlf
 
 import logging
 logger = logging.getLogger(__name__)
@@ -72,6 +72,12 @@ cdef class dispersion_model:
 
         self._metadata = ''
 
+        # Lookup table of CDF values for integer expected and
+        # observed counts; filled lazily by `_cdf`
+        self._cdf_table = None
+        self._cdf_table_exp_max = 250
+        self._cdf_table_obs_max = 1000
+
     # Pickling function
     def __reduce__(self):
         x = {}
@@ -116,12 +122,20 @@ cdef class dispersion_model:
             return self._mu_params
         def __set__(self, x):
             self._mu_params = np.array(x, order = 'c')
+            self._cdf_table = None
 
     property r_params:
         def __get__(self):
             return self._r_params
         def __set__(self, x):
             self._r_params = np.array(x, order = 'c')
+            self._cdf_table = None
+
+    property cdf_table:
+        """Cached lower-tail CDF values indexed by integer expected
+        and observed counts (`NaN` where not yet computed)"""
+        def __get__(self):
+            return np.asarray(self._cdf_table) if self._cdf_table is not None else None
 
 
     cpdef data_type_t fit_mu(self, data_type_t x):
@@ -162,6 +176,35 @@ cdef class dispersion_model:
 
         return res if res > 0.0 else 1e-6
 
+    @cython.cdivision(True)
+    cdef data_type_t _cdf(self, data_type_t x, int k):
+        """Computes the lower-tail negative binomial CDF at `k`
+        for expected count `x`. Values for integer `x` and `k`
+        within the table bounds are memoized; the fitted `r` and
+        `mu` only depend on `x` so repeated pairs are common.
+        """
+        cdef data_type_t r, mu, res
+        cdef bint cached = (0 <= x < self._cdf_table_exp_max
+                            and x == <int>x
+                            and 0 <= k < self._cdf_table_obs_max)
+
+        if cached:
+            if self._cdf_table is None:
+                self._cdf_table = np.full((self._cdf_table_exp_max, self._cdf_table_obs_max),
+                                            np.nan, dtype = np.float64, order = 'c')
+            res = self._cdf_table[<int>x, k]
+            if not isnan(res):
+                return res
+
+        r = self.fit_r(x)
+        mu = self.fit_mu(x)
+        res = nbinom.cdf(k, r/(r+mu), r)
+
+        if cached:
+            self._cdf_table[<int>x, k] = res
+
+        return res
+
     def __str__(self):
         """Print model to string"""
         raise NotImplementedError
@@ -305,17 +348,15 @@ cdef class dispersion_model:
             Array of p-values
         """     
         cdef int i, n = exp.shape[0]
-        cdef double r, mu
         cdef data_type_t [:] res = np.ones(n, dtype = np.float64, order = 'c')
 
         for i in range(n):
-            r = self.fit_r(exp[i])
-            mu = self.fit_mu(exp[i])
-            res[i] = nbinom.cdf(<int>obs[i], r/(r+mu), r)
+            res[i] = self._cdf(exp[i], <int>obs[i])
 
         return res
 
-    cpdef sample(self, data_type_t [:] x, int times):
+    @cython.cdivision(True)
+    cpdef sample(self, data_type_t [:] x, int times, rng = None):
         """Sample counts from negative binomial distribution and
         compute p-values
 
@@ -326,6 +367,9 @@ cdef class dispersion_model:
             to resample. This typically expected count values.
         times : int
             Number of times to sample (per element)
+        rng : :class:`numpy.random.Generator`, optional
+            Random number generator to draw samples from. If not
+            specified, the global (legacy) numpy random state is used
 
         Returns
         -------
@@ -335,22 +379,31 @@ cdef class dispersion_model:
             Array of sample counts (2-D array - positions by number of samples)
         """
         cdef int i, j, n = x.shape[0]
-        cdef data_type_t r, mu, k
+        cdef data_type_t r, mu
 
-        cdef long [:,:] sampled_vals = np.zeros((n, times), dtype = np.int_, order = 'c')
-        cdef data_type_t [:,:] sampled_pvals = np.ones((n, times), dtype = np.float64, order = 'c')
+        cdef data_type_t [:] rs = np.zeros(n, dtype = np.float64, order = 'c')
+        cdef data_type_t [:] ps = np.zeros(n, dtype = np.float64, order = 'c')
 
-        cdef long [:] vals
+        cdef long [:,:] sampled_vals
+        cdef data_type_t [:,:] sampled_pvals = np.ones((n, times), dtype = np.float64, order = 'c')
 
         for i in range(n):
             r = self.fit_r(x[i])
             mu = self.fit_mu(x[i])
-        
-            vals = np.random.negative_binomial(r, r/(r+mu), times)
-            
+            rs[i] = r
+            ps[i] = r/(r+mu)
+
+        # Draw all samples in one call (row-major, i.e. `times`
+        # samples for each position in turn)
+        if rng is None:
+            rng = np.random
+        sampled_vals = np.ascontiguousarray(
+            rng.negative_binomial(np.asarray(rs)[:,None], np.asarray(ps)[:,None], size = (n, times)),
+            dtype = np.int_)
+
+        for i in range(n):
             for j in range(times):
-                sampled_vals[i, j] = vals[j]
-                sampled_pvals[i, j] = nbinom.cdf(<int>vals[j], r/(r+mu), r)
+                sampled_pvals[i, j] = self._cdf(x[i], <int>sampled_vals[i, j])
 
         return sampled_vals, sampled_pvals
 
@@ -379,6 +432,9 @@ def learn_dispersion_model(h, cutoff = 250, trim = (2.5, 97.5)):
     ----
     Add exceptions for failure to fit, etc.
     """
+    from scipy import optimize
+    import pwlf
+
     size = int(h.shape[0])
     p = np.zeros(size)
     r = np.zeros(size)
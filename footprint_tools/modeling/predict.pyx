@@ -11,6 +11,8 @@ import numpy as np
 
 from genome_tools import genomic_interval
 
+from footprint_tools.modeling.bias import uniform_model
+
 cdef extern from "predict.h":
     struct result:
         double* exp
@@ -71,7 +73,7 @@ class prediction(object):
     read_func : :class:`cutcounts.bamfile`
        Cut-counts reader
     fasta_func : :class`pysam.FastaFile`
-        FASTA-file reader
+        FASTA-file reader (not used with a uniform bias model)
     half_win_width : int
         Window width to apply bias model (final windows size = 2W+1)
     padding : int
@@ -132,11 +134,15 @@ class prediction(object):
         pad_interval = x.widen(self.padding)
         pad_interval.start -= 1
 
-        # Get the raw cleavage counts and FASTA sequence
+        # Get the raw cleavage counts and FASTA sequence. A uniform
+        # bias model does not depend on sequence so skip the FASTA lookup
         raw_counts = self.read_func[pad_interval]
-        raw_seq = self.fasta_func.fetch(pad_interval.chrom, 
-                                        pad_interval.start-self.bm.offset(), 
-                                        pad_interval.end+self.bm.offset()).upper()
+
+        uniform = isinstance(self.bm, uniform_model)
+        if not uniform:
+            raw_seq = self.fasta_func.fetch(pad_interval.chrom, 
+                                            pad_interval.start-self.bm.offset(), 
+                                            pad_interval.end+self.bm.offset()).upper()
 
         obs_counts = {'+': None, '-': None}
         exp_counts = {'+': None, '-': None}
@@ -145,7 +151,9 @@ class prediction(object):
         for strand in ['+', '-']:
 
             # Pre-calculate the sequence bias propensity table from bias model
-            if strand == '+':
+            if uniform:
+                probs = np.ones(raw_counts[strand].shape[0])
+            elif strand == '+':
                 probs = self.bm.probs(raw_seq)
             else:
                 probs = self.bm.probs(reverse_complement(raw_seq))[::-1]
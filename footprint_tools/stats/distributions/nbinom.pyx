@@ -3,8 +3,6 @@ Implementation of negative binomial distribution
 """
 # cython: embedsignature=True
 
-import scipy.special
-import scipy.optimize
 import numpy as np
 
 cimport cython
@@ -39,6 +37,7 @@ def mle(par, data, sm):
     out : ndarray
         Likelihood of parameters given data
     """
+    import scipy.special
 
     p = par[0]
     r = par[1]
@@ -71,6 +70,8 @@ def fit(data, p = None, r = None):
         r = (av*av) / (va-av)
         p = (va-av) / (va)
 
+    import scipy.optimize
+
     sm = np.sum(data)/len(data)
     
     with warnings.catch_warnings():
@@ -2,12 +2,9 @@
 This module contains functions to perform multiple test correction.
 """
 import numpy as np
-import scipy.stats
 
 import operator
 
-from ..utils import bisect
-
 def emperical_fdr(pvals_null, pvals):
     """Computes emperical FDR from a distribution of null (sampled) p-values
 
@@ -24,12 +21,12 @@ def emperical_fdr(pvals_null, pvals):
         Empirically adjusted p-values to be compared directly with the desired FDR
     """
     sorted_pvals_null = np.sort(np.ravel(pvals_null))
-    sorted_pvals_idx = np.argsort(pvals)
 
-    counts = bisect(sorted_pvals_null, pvals[sorted_pvals_idx])
+    # Number of null p-values less than or equal to each observed p-value
+    counts = np.searchsorted(sorted_pvals_null, pvals, side='right')
     false_positive_rates = counts / len(sorted_pvals_null)
     false_positive_rates[false_positive_rates > 1] = 1
-    return false_positive_rates[np.argsort(sorted_pvals_idx)]
+    return false_positive_rates
 
 # Not sure if Storey FDR is best (appears to be too conservative)
 
@@ -70,6 +67,8 @@ def qvalue(pvals):
 
     """
 
+    import scipy.stats
+
     pi0 = pi0est(pvals)
 
     n = len(pvals)
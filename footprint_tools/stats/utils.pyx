@@ -49,6 +49,51 @@ cpdef segment(data_type_t [:] x, data_type_t threshold, int w = 1, bint decreasi
                 curr_start = -1
     return ret
 
+cpdef segment_multi(data_type_t [:] x, data_type_t [:] thresholds, int w = 1, bint decreasing = 0):
+    """Segment an array at several thresholds in a single pass
+
+    Equivalent to calling :func:`segment` once per threshold
+
+    Parameters
+    ----------
+    x : array_like
+        Array of values to segment
+    thresholds : array_like
+        Thresholds for grouping elements
+    w : int
+        Window size
+    decreasing : bool
+
+    Returns
+    -------
+    out : list
+        List (one per threshold) of lists of tuples which specific
+        the start and end index of contiguous intervals that pass
+        threshold
+
+    """
+    cdef double dir = -1 if decreasing else 1
+
+    cdef int i, j, nt = thresholds.shape[0]
+    cdef list ret = [[] for j in range(nt)]
+    cdef list r
+    cdef int [:] curr_start = np.full(nt, -1, dtype = np.intc)
+
+    for i in range(x.shape[0]):
+        for j in range(nt):
+            if curr_start[j] < 0:
+                if dir*x[i] >= dir*thresholds[j]:
+                    curr_start[j] = i-w+1
+            else:
+                if dir*x[i] < dir*thresholds[j]:
+                    r = ret[j]
+                    if len(r) > 0 and curr_start[j] <= r[-1][1]:
+                        r[-1][1] = i-1+w
+                    else:
+                        r.append( [curr_start[j], i-1+w] )
+                    curr_start[j] = -1
+    return ret
+
 cpdef bisect(data_type_t [:] a, data_type_t [:] b):
     """Bisect arrays
 
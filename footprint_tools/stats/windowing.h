@@ -83,6 +83,44 @@ double* fast_windowing_func(const double* const x, int n, int hw, func_t func_pt
     return res;
 }
 
+void fast_stouffers_z_2d(const double* const x, double* z, double* res, int n, int m, int hw)
+{
+    // Stouffer's Z-score method along the first axis of a row-major
+    // (n x m) array. Each column gives the same values as `fast_stouffers_z`:
+    // p-values are converted to z-scores once per element (stored to `z`,
+    // which may be the same array as `x`) and each window is summed in the
+    // same order. A window with an infinite combined z-score (i.e.,
+    // containing a p-value of exactly 0 or 1) is given a p-value of 0 or 1.
+    // Only rows hw to n-hw-1 of `res` are written
+    int i, j, l, k = 2 * hw + 1;
+    double s, sk = sqrt((double)k);
+
+    for (i = 0; i < n * m; ++i)
+    {
+        z[i] = hcephes_ndtri(1.0 - x[i]);
+    }
+
+    for (i = hw; i < n-hw; ++i)
+    {
+        for (j = 0; j < m; ++j)
+        {
+            res[i*m+j] = 0.0;
+        }
+        for (l = i-hw; l <= i+hw; ++l)
+        {
+            for (j = 0; j < m; ++j)
+            {
+                res[i*m+j] += z[l*m+j];
+            }
+        }
+        for (j = 0; j < m; ++j)
+        {
+            s = res[i*m+j] / sk;
+            res[i*m+j] = isinf(s) ? (s > 0 ? 0.0 : 1.0) : hcephes_ndtr(-s);
+        }
+    }
+}
+
 double fast_weighted_stouffers_z(const double* const x, const double* const w, int k)
 {
     int i;
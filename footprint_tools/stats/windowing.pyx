@@ -27,6 +27,7 @@ cdef extern from "windowing.h":
     double fast_fishers_combined(const double* const, int)
     double fast_stouffers_z(const double* const, int)
     double* fast_windowing_func(const double* const, int, int, func_t)
+    void fast_stouffers_z_2d(const double* const, double*, double*, int, int, int)
     #
     double fast_weighted_stouffers_z(const double* const, const double* const, int)
     double* fast_weighted_windowing_func(const double* const, const double* const, int, int, weighted_func_t)
@@ -129,6 +130,67 @@ cpdef stouffers_z(data_type_t [:] x, int hw):
     """
     return windowing_func(x, hw, fast_stouffers_z)
 
+def stouffers_z_2d(x, int hw, out = None, bint overwrite_x = False):
+    """Compute p-values for a window using Stouffer's Z-score method
+    along the first axis of an array
+
+    Vectorized equivalent of :func:`stouffers_z` that combines all
+    columns of a 2-D array (e.g., sampled null p-values) in a single
+    pass rather than calling :func:`stouffers_z` per column.
+
+    Paramters
+    ---------
+    x : :class:`numpy.ndarray`
+        P-values to perform Stouffer's Z-score method (1-D or 2-D).
+        Windows are computed along the first axis
+    hw: int
+        Half window with to combined p-values
+    out : :class:`numpy.ndarray`, optional
+        C-contiguous float64 array (same shape as `x`) to store the
+        results in. Allows a buffer to be reused across calls
+    overwrite_x : bool
+        Use `x` to store intermediate z-scores rather than allocating a
+        temporary array. Only applies if `x` is a C-contiguous float64
+        array; the contents of `x` are overwritten
+
+    Returns
+    -------
+    out : :class:`numpy.ndarray`
+       Array of combined p-values (same shape as `x`)
+
+    Notes
+    -----
+    Windows that contain a p-value of 0 (or one small enough that
+    `1 - p` rounds to 1) are assigned a combined p-value of 0, and
+    windows that contain a p-value of 1 are assigned a combined p-value
+    of 1. :func:`stouffers_z` returns `NaN` for these windows. All other
+    values are identical to :func:`stouffers_z`.
+    """
+    cdef int k = 2 * hw + 1
+
+    x = np.ascontiguousarray(x, dtype = np.float64)
+
+    cdef int n = x.shape[0]
+    cdef int m = x.size // n if n > 0 else 0
+
+    if out is None:
+        out = np.ones(x.shape, dtype = np.float64, order = 'c')
+    else:
+        out.fill(1.0)
+
+    if n < k or m == 0:
+        return out
+
+    z = x if overwrite_x else np.empty_like(x)
+
+    cdef data_type_t [:, ::1] x_view = x.reshape(n, m)
+    cdef data_type_t [:, ::1] z_view = z.reshape(n, m)
+    cdef data_type_t [:, ::1] res_view = out.reshape(n, m)
+
+    fast_stouffers_z_2d(&x_view[0, 0], &z_view[0, 0], &res_view[0, 0], n, m, hw)
+
+    return out
+
 cdef weighted_windowing_func(data_type_t [:] x, data_type_t [:] w, int hw, weighted_func_t func_ptr):
     """Weighted windowing function wrapper that passes ndarray to
     fast functions written in native C
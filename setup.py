@@ -36,7 +36,7 @@ modules = [
 
 install_requires = [
     "cython",
-    "numpy>=1.10",
+    "numpy>=1.17",
     "scipy>=0.17",
     "pandas",
     "pysam>=0.15",